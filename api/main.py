@@ -1,8 +1,9 @@
 import os
+import asyncio
 from typing import Any
 from pathlib import Path
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +13,7 @@ from src.document_ingestion.document_ingest import (DocHandler, DocumentComparat
 from src.document_analyser.document_analysis import DocumentAnalysis
 from src.document_compare.document_comparator import DocumentComparatorLLM
 from utils.document_ops import FastAPIFileAdapter, read_pdf_via_handler
+from utils.model_loader import ModelLoader
 from logger import GLOBAL_LOGGER as log
 
 
@@ -34,6 +36,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def _init_services():
+    # Model clients, prompts and parsers are stateless across requests: build them once per worker
+    app.state.model_loader = ModelLoader()
+    app.state.analysis = DocumentAnalysis(model_loader=app.state.model_loader)
+    app.state.comparator = DocumentComparatorLLM(model_loader=app.state.model_loader)
+    log.info("Document services initialized")
+
+def get_analysis(request: Request) -> DocumentAnalysis:
+    return request.app.state.analysis
+
+def get_comparator(request: Request) -> DocumentComparatorLLM:
+    return request.app.state.comparator
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_ui(request: Request):
     log.info("Serving UI Home Page")
@@ -47,14 +63,13 @@ async def health():
     return {"status": "ok", "service": "document-portal"}
 
 @app.post("/analyze")
-async def analyze(file: UploadFile = File(...)) -> Any:
+async def analyze(file: UploadFile = File(...), analysis: DocumentAnalysis = Depends(get_analysis)) -> Any:
     try:
         log.info(f"Received file for analysis: {file.filename}")
         dh = DocHandler()
-        saved_path = dh.save_pdf(FastAPIFileAdapter(file))
-        text = read_pdf_via_handler(dh, saved_path)
-        analysis = DocumentAnalysis()
-        result = analysis.analyse_document(text)
+        saved_path = await dh.save_pdf(FastAPIFileAdapter(file))
+        text = await asyncio.to_thread(read_pdf_via_handler, dh, saved_path)
+        result = await analysis.analyse_document(text)
         log.info("Document analysis completed")
         return {"analysis": result}
 
@@ -65,22 +80,20 @@ async def analyze(file: UploadFile = File(...)) -> Any:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/compare")
-async def compare(reference_file: UploadFile = File(...), actual_file: UploadFile = File(...)) -> Any:
+async def compare(reference_file: UploadFile = File(...), actual_file: UploadFile = File(...),
+                  comp: DocumentComparatorLLM = Depends(get_comparator)) -> Any:
 
     try:
         log.info(f"Received files for comparison: {reference_file.filename} and {actual_file.filename}")
         dc = DocumentComparator()
-        reference_path, actual_path = dc.save_uploaded_files(
-            
+        reference_path, actual_path = await dc.save_uploaded_files(
             FastAPIFileAdapter(reference_file),
-             FastAPIFileAdapter(actual_file))
-        _ = reference_path, actual_path
+            FastAPIFileAdapter(actual_file))
 
-        combined_docs = dc.combine_documents()
-        comp = DocumentComparatorLLM()
-        df = comp.compare_documents(combined_docs)
+        combined_docs = await dc.combine_documents([reference_path, actual_path])
+        rows = await comp.compare_documents(combined_docs)
         log.info("Document comparison completed.")
-        return {"rows": df.to_dict(orient="records"), "session_id": dc.session_id}
+        return {"rows": rows, "session_id": dc.session_id}
     except HTTPException:
         raise
     except Exception as e:
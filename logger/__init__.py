@@ -1,4 +1,11 @@
 # logger/__init__.py
+import logging
 from .custom_logger import CustomLogger
+
+LOGGER_NAME = "doc_portal"
 # Create a single shared logger instance
-GLOBAL_LOGGER = CustomLogger().get_logger("doc_portal")
\ No newline at end of file
+GLOBAL_LOGGER = CustomLogger().get_logger(LOGGER_NAME)
+
+def is_enabled_for(level: int) -> bool:
+    """Cheap level check for call sites that build expensive log payloads."""
+    return logging.getLogger(LOGGER_NAME).isEnabledFor(level)
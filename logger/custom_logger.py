@@ -1,19 +1,27 @@
 import os
+import queue
+import atexit
 import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
+from typing import Optional
 import structlog
 
 
 class CustomLogger:
+    # Shared by every instance: handlers and structlog are configured once per process
+    _listener: Optional[QueueListener] = None
+    _configured = False
+    _lock = threading.Lock()
+
     def __init__(self, logs_dir: str = "logs"):
         self.logs_dir = os.path.join(os.getcwd(), 'logs')
         os.makedirs(self.logs_dir, exist_ok=True)
 
         self.log_file_path = os.path.join(self.logs_dir, f"{datetime.now().strftime('%Y-%m-%d')}.log")    
 
-    def get_logger(self,name=__file__):
-        logger_name = os.path.basename(name)
-
+    def _configure(self):
         file_handler = logging.FileHandler(self.log_file_path)
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(logging.Formatter("%(message)s"))
@@ -22,11 +30,17 @@ class CustomLogger:
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(logging.Formatter("%(message)s"))
 
-        logging.basicConfig(
-            handlers=[file_handler, console_handler],
-            level=logging.INFO,
-            format="%(message)s"
-        )
+        # Records are pushed onto a queue; a background thread owns the blocking file/console writes
+        log_queue: queue.Queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        CustomLogger._listener = listener
+
+        # Attach to root directly: basicConfig is a silent no-op once any root handler exists
+        root = logging.getLogger()
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
 
         structlog.configure(
             processors=[
@@ -39,4 +53,13 @@ class CustomLogger:
             cache_logger_on_first_use=True
         )
 
-        return structlog.get_logger(logger_name)
\ No newline at end of file
+    def get_logger(self,name=__file__):
+        logger_name = os.path.basename(name)
+
+        if not CustomLogger._configured:
+            with CustomLogger._lock:
+                if not CustomLogger._configured:
+                    self._configure()
+                    CustomLogger._configured = True
+
+        return structlog.get_logger(logger_name)
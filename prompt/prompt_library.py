@@ -11,6 +11,21 @@ Analyze this document:
 {document_text}
 """)
 
+document_comparison_prompt = ChatPromptTemplate.from_template("""
+You will be provided with content from two PDFs. Your tasks are as follows:
+1. Compare the content in the two PDFs.
+2. Identify the differences and note down the page number.
+3. The output you provide must be a page-wise comparison.
+4. If a page does not have any change, mention it as 'NO CHANGE'.
+
+Input documents:
+{combined_docs}
+
+Your response should follow this format:
+{format_instructions}
+""")
+
 PROMPT_REGISTRY = {
-    "document_analysis": document_analysis_prompt
+    "document_analysis": document_analysis_prompt,
+    "document_comparison": document_comparison_prompt
 }
\ No newline at end of file
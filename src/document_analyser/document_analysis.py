@@ -1,4 +1,5 @@
 import sys
+from typing import Optional
 from utils.model_loader import ModelLoader
 from langchain_core.output_parsers import JsonOutputParser
 from langchain.output_parsers import OutputFixingParser
@@ -10,15 +11,17 @@ from logger import GLOBAL_LOGGER as log
 
 class DocumentAnalysis:
     "Analyses documents"
-    def __init__(self):
+    def __init__(self, model_loader: Optional[ModelLoader] = None):
         try:
-            self.loader = ModelLoader()
+            self.loader = model_loader or ModelLoader()
             self.llm = self.loader.load_llm()
 
             self.parser = JsonOutputParser(pydantic_object=Metadata)
             self.fixing_parser = OutputFixingParser.from_llm(self.llm, self.parser)
 
             self.prompt = PROMPT_REGISTRY["document_analysis"]
+            self.chain = self.prompt | self.llm | self.fixing_parser
+            self.format_instructions = self.parser.get_format_instructions()
 
             log.info("Document analysis initialized")
 
@@ -27,16 +30,14 @@ class DocumentAnalysis:
             raise DocumentPortalException(f"Failed to initialize document analysis", sys)
 
 
-    def analyse_document(self, document_text: str) -> dict:
+    async def analyse_document(self, document_text: str) -> dict:
 
         try:
 
-            chain = self.prompt | self.llm | self.fixing_parser
-
             log.info("Analysing document")
 
-            response = chain.invoke({
-                "format_instructions": self.parser.get_format_instructions(),
+            response = await self.chain.ainvoke({
+                "format_instructions": self.format_instructions,
                  "document_text": document_text})
 
             log.info("Document analysed successfully",key=list(response.keys()))
@@ -1,8 +1,9 @@
 import sys
-from dotenv import load_dotenv
+from typing import Optional
 from utils.model_loader import ModelLoader
 from langchain_core.output_parsers import JsonOutputParser
 from langchain.output_parsers import OutputFixingParser
+from exceptions.custom_exception import DocumentPortalException
 from logger import GLOBAL_LOGGER as log
 from prompt.prompt_library import PROMPT_REGISTRY
 from models.model import PromptType,SummaryResponse
@@ -11,27 +12,27 @@ from models.model import PromptType,SummaryResponse
 
 class DocumentComparatorLLM:
 
-    def __init__(self):
-        load_dotenv()
-        self.loader = ModelLoader()
+    def __init__(self, model_loader: Optional[ModelLoader] = None):
+        self.loader = model_loader or ModelLoader()
         self.llm = self.loader.load_llm()
         self.prompt = PROMPT_REGISTRY[PromptType.DOCUMENT_COMPARISON.value]
         self.parser = JsonOutputParser(pydantic_object=SummaryResponse)
         self.fixing_parser = OutputFixingParser.from_llm(self.llm, self.parser)
         self.chain = self.prompt | self.llm | self.fixing_parser
+        self.format_instructions = self.parser.get_format_instructions()
         log.info("Document comparator initialized")
 
 
-    def compare_documents(self, combined_docs: str) -> pd.DataFrame:
+    async def compare_documents(self, combined_docs: str) -> list[dict]:
 
         try:
             inputs = {
-                "format_instructions": self.parser.get_format_instructions(),
+                "format_instructions": self.format_instructions,
                 "combined_docs": combined_docs
             }
 
             log.info("Invoking document comparison LLM chain")
-            response = self.chain.invoke(inputs)
+            response = await self.chain.ainvoke(inputs)
             log.info("Chain invoked successfully", response_preview=str(response)[:200])
             return self._format_response(response)
 
@@ -39,10 +40,12 @@ class DocumentComparatorLLM:
             log.error(f"Error comparing documents: {e}")
             raise DocumentPortalException(f"Error comparing documents: {e}", sys)
 
-    def _format_response(self, response: list[dict]) -> pd.DataFrame: #type: ignore
-
+    def _format_response(self, response: list[dict]) -> list[dict]:
+        # Rows go straight to the JSON response; a DataFrame round-trip would only copy them
         try:
-            return pd.DataFrame(response)
+            if not isinstance(response, list):
+                raise TypeError(f"Expected a list of rows, got {type(response).__name__}")
+            return response
         except Exception as e:
             log.error(f"Error formatting response: {e}")
             raise DocumentPortalException(f"Error formatting response: {e}", sys)
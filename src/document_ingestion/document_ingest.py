@@ -1,11 +1,21 @@
 import os
-import json
-import hashlib
+import io
+import asyncio
 import sys
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 
+import aiofiles
+import faiss
 import fitz  # PyMuPDF
+import numpy as np
+import orjson
+import xxhash
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 
@@ -17,25 +27,109 @@ from logger import GLOBAL_LOGGER as log
 
 SUPPORTED_EXTENSIONS = [".pdf", ".docx", ".txt"]
 
+HNSW_MAX_ROWS = 500_000
+HNSW_M = 32
+DEFAULT_FAISS_NPROBE = 16
+EMBED_BATCH_SIZE = 100
+EMBED_MAX_WORKERS = 4
+
+# Loaded indexes stay resident per process, keyed by index dir and invalidated on index.faiss mtime
+_INDEX_CACHE: Dict[str, Tuple[float, FAISS]] = {}
+_INDEX_CACHE_LOCK = threading.Lock()
+# The cached FAISS object is shared and mutated in place, so writers to one index dir take its lock
+_INDEX_LOCKS: Dict[str, threading.Lock] = {}
+
+def _index_lock(key: str) -> threading.Lock:
+    with _INDEX_CACHE_LOCK:
+        return _INDEX_LOCKS.setdefault(key, threading.Lock())
+
+def _faiss_nprobe() -> int:
+    # Read at use time so a value from .env (loaded by ModelLoader) is honoured
+    raw = os.getenv("FAISS_NPROBE")
+    if not raw:
+        return DEFAULT_FAISS_NPROBE
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"FAISS_NPROBE must be an integer, got {raw!r}") from None
+
+def _extract_page_texts(doc: fitz.Document) -> List[str]:
+    return [doc.load_page(page_num).get_text("text") for page_num in range(doc.page_count)]
+
+def _copy_fileobj(source, save_path: str) -> None:
+    source.seek(0)
+    with open(save_path, "wb") as out:
+        # A SpooledTemporaryFile that has rolled to disk has a real fd: let the kernel copy it
+        in_fd = None
+        if getattr(source, "_rolled", True) and hasattr(os, "sendfile"):
+            try:
+                in_fd = source.fileno()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                in_fd = None
+        if in_fd is None:
+            shutil.copyfileobj(source, out, length=1 << 20)
+            return
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+async def _write_upload(uploaded_file, save_path: str) -> None:
+    # File-backed uploads are copied through a fixed buffer (or sendfile) off the event loop
+    source = getattr(uploaded_file, "file", None)
+    if source is None and hasattr(uploaded_file, "read") and hasattr(uploaded_file, "seek"):
+        source = uploaded_file
+    if source is not None:
+        await asyncio.to_thread(_copy_fileobj, source, save_path)
+        return
+
+    # Stream chunks from async adapters; fall back to in-memory buffers for sync callers
+    async with aiofiles.open(save_path, "wb") as f:
+        if hasattr(uploaded_file, "stream"):
+            async for chunk in uploaded_file.stream():
+                await f.write(chunk)
+        elif hasattr(uploaded_file, "read"):
+            await f.write(uploaded_file.read())
+        else:
+            await f.write(uploaded_file.getbuffer())
+
 class FaissManager:
 
+    FINGERPRINT_SCHEME = "xxh3_128"
+
     def __init__(self, index_dir:Path, model_loader:Optional[ModelLoader] = None):
         self.index_dir = Path(index_dir)
         self.index_dir.mkdir(parents=True, exist_ok=True)
 
         self.meta_path = self.index_dir / "ingested_meta.json"
-        self._meta : Dict[str, Any] = {"rows":{}}
+        self._meta : Dict[str, Any] = {"rows":set()}
 
         if self.meta_path.exists():
             try:
-                meta_text = self.meta_path.read_text(encoding="utf-8")
-                self._meta = json.loads(meta_text) if meta_text else {"rows":{}}
+                meta_bytes = self.meta_path.read_bytes()
+                self._meta = orjson.loads(meta_bytes) if meta_bytes else {"rows":[]}
+                # Rows are persisted as a list (older files used a {key: true} map); keep a set in memory
+                self._meta["rows"] = set(self._meta.get("rows") or ())
             except Exception as e:
-                self._meta = {"rows":{}}
+                self._meta = {"rows":set()}
 
         self.model_loader = model_loader or ModelLoader()
         self.embedding = self.model_loader.load_embedding_model()
         self.vectorstore : Optional[FAISS] = None
+        self._lock = _index_lock(self._cache_key())
+
+    def _cache_key(self) -> str:
+        return str(self.index_dir.resolve())
+
+    def _index_mtime(self) -> float:
+        return (self.index_dir / "index.faiss").stat().st_mtime
+
+    def _cache_vectorstore(self):
+        with _INDEX_CACHE_LOCK:
+            _INDEX_CACHE[self._cache_key()] = (self._index_mtime(), self.vectorstore)
 
     def _exists(self)-> bool:
         return (self.index_dir / "index.faiss").exists() and (self.index_dir / "index.pkl").exists()
@@ -44,49 +138,109 @@ class FaissManager:
     def _fingerprint(text: str, md: Dict[str, Any])-> str:
         src = md.get("source", "") or md.get("file_path", "")
         rid = md.get("row_id", "") 
-        if src is not None:
+        if src:
             return f"{src}::{'' if rid is None else rid}"
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
     
     def _save_meta(self):
-        self.meta_path.write_text(json.dumps(self._meta, ensure_ascii=False,  indent=2), encoding="utf-8")
+        self._meta["fingerprint"] = self.FINGERPRINT_SCHEME
+        self.meta_path.write_bytes(orjson.dumps({**self._meta, "rows": sorted(self._meta["rows"])}))
+
+    @staticmethod
+    def _build_ann_index(vectors: np.ndarray) -> faiss.Index:
+        # HNSW for small/medium corpora, IVF+PQ once brute-force search and raw storage stop scaling
+        n, d = vectors.shape
+        m = d // 8
+        if n < HNSW_MAX_ROWS or m == 0 or d % m:
+            index = faiss.IndexHNSWFlat(d, HNSW_M)
+        else:
+            nprobe = _faiss_nprobe()
+            nlist = int(np.sqrt(n))
+            quantizer = faiss.IndexFlatL2(d)
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, m, 8)
+            index.train(vectors)
+            index.nprobe = nprobe
+        index.add(vectors)
+        return index
+
+    def _rebuild_meta(self):
+        # Re-key rows from the docstore so documents recorded under an older fingerprint scheme still dedupe
+        rows = set()
+        for doc_id in self.vectorstore.index_to_docstore_id.values():
+            doc = self.vectorstore.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                rows.add(self._fingerprint(doc.page_content, doc.metadata or {}))
+        self._meta = {"rows": rows}
+        self._save_meta()
+        log.info("FAISS meta rebuilt", index_dir=str(self.index_dir), rows=len(rows), fingerprint=self.FINGERPRINT_SCHEME)
 
     def add_documents(self, docs: List[Document]):
 
         if self.vectorstore is None:
             raise RuntimeError("Call load_or_create() before add_documents_idempotent().")
         
-        new_docs : List[Document] = []
-
-        for d in docs:
-            key = self._fingerprint(d.page_content, d.metadata or {})
-
-            if key in self._meta["rows"]:
-                continue
-
-            self._meta["rows"][key] = True
-            new_docs.append(d)
-
-        if new_docs:
-            self.vectorstore.add_documents(new_docs)
-            self.vectorstore.save_local(self.index_dir)
-            self._save_meta()
+        with self._lock:
+            new_docs : List[Document] = []
+
+            for d in docs:
+                key = self._fingerprint(d.page_content, d.metadata or {})
+
+                if key in self._meta["rows"]:
+                    continue
+
+                self._meta["rows"].add(key)
+                new_docs.append(d)
+
+            if new_docs:
+                batches = [new_docs[i:i + EMBED_BATCH_SIZE] for i in range(0, len(new_docs), EMBED_BATCH_SIZE)]
+                with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as ex:
+                    batch_embeddings = list(ex.map(lambda batch: self.embedding.embed_documents([d.page_content for d in batch]), batches))
+                for batch, embs in zip(batches, batch_embeddings):
+                    self.vectorstore.add_embeddings(
+                        list(zip((d.page_content for d in batch), embs)),
+                        metadatas=[d.metadata for d in batch],
+                    )
+                self.vectorstore.save_local(self.index_dir)
+                self._cache_vectorstore()
+                self._save_meta()
 
         return len(new_docs)
 
     def load_or_create(self, texts:Optional[List[str]] = None, metadata:Optional[List[dict]] = None):
-        if self._exists():
-            self.vectorstore = FAISS.load_local(str(self.index_dir), embeddings = self.embedding, allow_dangerous_deserialization=True)
+        with self._lock:
+            if self._exists():
+                with _INDEX_CACHE_LOCK:
+                    cached = _INDEX_CACHE.get(self._cache_key())
+                if cached and cached[0] == self._index_mtime():
+                    self.vectorstore = cached[1]
+                else:
+                    self.vectorstore = FAISS.load_local(str(self.index_dir), embeddings = self.embedding, allow_dangerous_deserialization=True)
+                    if isinstance(self.vectorstore.index, faiss.IndexIVF):
+                        self.vectorstore.index.nprobe = _faiss_nprobe()
+                    self._cache_vectorstore()
+                if self._meta.get("fingerprint") != self.FINGERPRINT_SCHEME:
+                    self._rebuild_meta()
+
+                return self.vectorstore
+
+            if not texts:
+                raise DocumentPortalException("No existing FAISS index and no data to create one", sys)
+
+            vectors = np.asarray(self.embedding.embed_documents(texts), dtype="float32")
+            # Build the ANN index directly rather than letting FAISS.from_embeddings fill an IndexFlatL2 first
+            index = self._build_ann_index(vectors)
+            del vectors
+            metadatas = metadata or [{} for _ in texts]
+            ids = [str(uuid.uuid4()) for _ in texts]
+            docstore = InMemoryDocstore({
+                doc_id: Document(page_content=text, metadata=md) for doc_id, text, md in zip(ids, texts, metadatas)
+            })
+            self.vectorstore = FAISS(self.embedding, index, docstore, dict(enumerate(ids)))
+            log.info("FAISS index created", index_dir=str(self.index_dir), rows=len(texts), index_type=type(self.vectorstore.index).__name__)
+            self.vectorstore.save_local(str(self.index_dir))
+            self._cache_vectorstore()
 
             return self.vectorstore
-
-        if not texts:
-            raise DocumentPortalException("No existing FAISS index and no data to create one", sys)
-
-        self.vectorstore = FAISS.from_texts(texts, self.embedding, metadatas=metadata or [])
-        self.vectorstore.save_local(str(self.index_dir))
-
-        return self.vectorstore
     
 class DocHandler:
 
@@ -99,18 +253,14 @@ class DocHandler:
         os.makedirs(self.session_path, exist_ok=True)
         log.info("DocHandler initialized", session_id=self.session_id, session_path=self.session_path)
 
-    def save_pdf(self, uploaded_file) -> str:
+    async def save_pdf(self, uploaded_file) -> str:
 
         try:
             filename = os.path.basename(uploaded_file.name)
             if not filename.endswith(".pdf"):
                 raise ValueError("Only PDF files are supported")
             save_path = os.path.join(self.session_path, filename)
-            with open(save_path, "wb") as f:
-                if hasattr(uploaded_file, "read"):
-                    f.write(uploaded_file.read())
-                else:
-                    f.write(uploaded_file.getbuffer())
+            await _write_upload(uploaded_file, save_path)
             log.info("PDF saved successfully", file=filename, save_path=save_path, session_id=self.session_id)
             return save_path
         except Exception as e:
@@ -120,14 +270,20 @@ class DocHandler:
     def read_pdf(self, pdf_path:str) -> str:
 
         try:
-            text_chunks = []
             with fitz.open(pdf_path) as doc:
-                for page_num in range(doc.page_count):
-                    page = doc.load_page(page_num)
-                    text_chunks.append((f"\n--- Page {page_num + 1} ---\n{page.get_text()}"))
-
-            text = "\n".join(text_chunks)
-            log.info("PDF read successfully", pdf_path=pdf_path, session_id=self.session_id, pages=len(text_chunks))
+                if doc.needs_pass:
+                    raise ValueError("Password-protected PDFs are not supported.")
+                page_texts = _extract_page_texts(doc)
+            # Header and body go in as separate entries so page text is copied only once, by the join
+            text_chunks = []
+            for page_num, page_text in enumerate(page_texts):
+                if page_num:
+                    text_chunks.append("\n")
+                text_chunks.append(f"\n--- Page {page_num + 1} ---\n")
+                text_chunks.append(page_text)
+
+            text = "".join(text_chunks)
+            log.info("PDF read successfully", pdf_path=pdf_path, session_id=self.session_id, pages=len(page_texts))
             return text
         except Exception as e:
             log.error("Failed to read PDF", error=str(e), session_id=self.session_id, pdf_path=pdf_path)
@@ -135,25 +291,32 @@ class DocHandler:
 
 class DocumentComparator:
 
+    # Uploads are stored under these prefixes so two versions of the same file can be compared
+    REFERENCE_PREFIX = "reference_"
+    ACTUAL_PREFIX = "actual_"
+
     def __init__(self, base_dir:str = "data/document_compare", session_id:Optional[str] = None):
-        self.base_dir = base_dir
+        self.base_dir = Path(base_dir)
         self.session_id = session_id or generate_session_id("session")
-        self.session_path = os.path.join(self.base_dir, self.session_id)
-        os.makedirs(self.session_path, exist_ok=True)
-        log.info("DocumentComparator initialized", session_id=self.session_id, session_path=self.session_path)
+        self.session_path = self.base_dir / self.session_id
+        self.session_path.mkdir(parents=True, exist_ok=True)
+        self._pdf_files: Optional[List[Path]] = None
+        log.info("DocumentComparator initialized", session_id=self.session_id, session_path=str(self.session_path))
         
-    def save_uploaded_files(self, reference_file:UploadFile, actual_file:UploadFile):
+    async def save_one(self, fobj, out: str) -> str:
+        if not fobj.name.lower().endswith(".pdf"):
+            raise ValueError("Only PDF files are allowed.")
+        await _write_upload(fobj, out)
+        return out
+
+    async def save_uploaded_files(self, reference_file, actual_file):
         try:
-            reference_path = os.path.join(self.session_path, reference_file.filename)
-            actual_path = os.path.join(self.session_path, actual_file.filename)
-            for fobj, out in ((reference_file, reference_path), (actual_file, actual_path)):
-                if not fobj.name.lower().endswith(".pdf"):
-                    raise ValueError("Only PDF files are allowed.")
-                with open(out, "wb") as f:
-                    if hasattr(fobj, "read"):
-                        f.write(fobj.read())
-                    else:
-                        f.write(fobj.getbuffer())
+            reference_path = os.path.join(self.session_path, self.REFERENCE_PREFIX + os.path.basename(reference_file.name))
+            actual_path = os.path.join(self.session_path, self.ACTUAL_PREFIX + os.path.basename(actual_file.name))
+            reference_path, actual_path = await asyncio.gather(
+                self.save_one(reference_file, reference_path),
+                self.save_one(actual_file, actual_path))
+            self._pdf_files = None
 
             log.info("Files saved", reference=str(reference_path), actual=str(actual_path), session=self.session_id)
             return reference_path, actual_path
@@ -166,45 +329,73 @@ class DocumentComparator:
 
         try:
             with fitz.open(pdf_path) as doc:
+                if doc.needs_pass:
+                    raise ValueError("Password-protected PDFs are not supported.")
                 if doc.is_encrypted:
                     raise ValueError("Encrypted PDFs are not supported.")
-                parts = []
-                for page_num in range(doc.page_count):
-                    page = doc.load_page(page_num)
-                    text = page.get_text() #type: ignore
-                    if text.strip():
-                        parts.append(f"\n --- Page {page_num + 1} --- \n{text}")
-            log.info("PDF read successfully", file=str(pdf_path), pages=len(parts))
-            return "\n".join(parts)
+                page_texts = _extract_page_texts(doc)
+            parts = []
+            pages = 0
+            for page_num, text in enumerate(page_texts):
+                if text.strip():
+                    if pages:
+                        parts.append("\n")
+                    parts.append(f"\n --- Page {page_num + 1} --- \n")
+                    parts.append(text)
+                    pages += 1
+            log.info("PDF read successfully", file=str(pdf_path), pages=pages)
+            return "".join(parts)
         except Exception as e:
             log.error("Failed to read PDF", error=str(e), session=self.session_id, pdf_path=pdf_path)
             raise DocumentPortalException(f"Failed to read PDF: {str(e)}", sys) from e
 
-    def combine_documents(self) -> str:
+    def _session_pdfs(self) -> List[Path]:
+        if self._pdf_files is None:
+            # Reference before actual, matching the order the comparison prompt expects
+            self._pdf_files = sorted(self.session_path.glob("*.[pP][dD][fF]"),
+                                     key=lambda p: (not p.name.startswith(self.REFERENCE_PREFIX), p.name))
+        return self._pdf_files
+
+    def _display_name(self, file: Path) -> str:
+        # Headers carry the name the user uploaded, not the on-disk prefix
+        for prefix in (self.REFERENCE_PREFIX, self.ACTUAL_PREFIX):
+            if file.name.startswith(prefix):
+                return file.name[len(prefix):]
+        return file.name
+
+    async def combine_documents(self, paths: Optional[List[str]] = None) -> str:
         try:
-            docs = []
-            for file in sorted(self.session_path.iterdir()):
-                if file.is_file() and file.suffix.lower() == ".pdf":
-                    content = self.read_pdf(str(file))
-                    docs.append(f"Document: {file.name}\n{content}")
-
-            combined_text = = "\n\n".join(docs)
-            log.info("Documents combined", count=len(doc_parts), session=self.session_id)
+            files = [Path(p) for p in paths] if paths is not None else self._session_pdfs()
+            # Documents are independent, so parse them concurrently off the event loop
+            contents = await asyncio.gather(*(asyncio.to_thread(self.read_pdf, str(file)) for file in files))
+            parts = []
+            count = 0
+            for file, content in zip(files, contents):
+                if count:
+                    parts.append("\n\n")
+                parts.append(f"Document: {self._display_name(file)}\n")
+                parts.append(content)
+                count += 1
+
+            combined_text = "".join(parts)
+            log.info("Documents combined", count=count, session=self.session_id)
             return combined_text
         except Exception as e:
             log.error("Failed to combine documents", error=str(e), session=self.session_id)
             raise DocumentPortalException(f"Failed to combine documents: {str(e)}", sys) from e
 
-    def cleanup(self):
+    def cleanup(self, keep_latest: int = 5):
         try:
-            sessions = sorted([f for f in self.base_dir.iterdir() if f.is_dir()], reverse=True)
+            # scandir's DirEntry caches the stat result, so is_dir() does not hit the disk again
+            with os.scandir(self.base_dir) as entries:
+                sessions = [entry for entry in entries if entry.is_dir()]
+            # Let sessions accumulate up to twice the limit so most requests skip the sort and rmtree pass
+            if len(sessions) <= keep_latest * 2:
+                return
+            sessions.sort(key=lambda entry: entry.name, reverse=True)
             for folder in sessions[keep_latest:]:
-                shutil.rmtree(folder, ignore_errors=True)
-                log.info("Old session folder deleted", path=str(folder))
+                shutil.rmtree(folder.path, ignore_errors=True)
+                log.info("Old session folder deleted", path=folder.path)
         except Exception as e:
             log.error("Error cleaning old sessions", error=str(e))
             raise DocumentPortalException("Error cleaning old sessions", e) from e
-
-        
-        
-
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import faiss
+import fitz  # PyMuPDF
+import pytest
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.document_ingestion.document_ingest import DocHandler, DocumentComparator, FaissManager, _faiss_nprobe
+
+
+class _FakeModelLoader:
+    def load_embedding_model(self):
+        return DeterministicFakeEmbedding(size=16)
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    path = tmp_path / "sample.pdf"
+    with fitz.open() as doc:
+        for text in ("First page text", "Second page text"):
+            doc.new_page().insert_text((72, 72), text)
+        doc.save(path)
+    return str(path)
+
+
+def test_doc_handler_reads_pdf(tmp_path, sample_pdf):
+    handler = DocHandler(data_dir=str(tmp_path / "analysis"))
+    text = handler.read_pdf(sample_pdf)
+
+    assert "--- Page 1 ---" in text
+    assert "--- Page 2 ---" in text
+    assert text.index("First page text") < text.index("Second page text")
+
+
+def test_document_comparator_reads_pdf(tmp_path, sample_pdf):
+    comparator = DocumentComparator(base_dir=str(tmp_path / "compare"))
+    text = comparator.read_pdf(sample_pdf)
+
+    assert "--- Page 1 ---" in text
+    assert "--- Page 2 ---" in text
+    assert text.index("First page text") < text.index("Second page text")
+
+
+def test_faiss_manager_creates_ann_index(tmp_path):
+    manager = FaissManager(tmp_path / "faiss", model_loader=_FakeModelLoader())
+    texts = ["alpha", "beta", "gamma"]
+    vs = manager.load_or_create(texts=texts, metadata=[{"source": t} for t in texts])
+
+    assert isinstance(vs.index, faiss.IndexHNSWFlat)
+    assert vs.index.ntotal == len(texts)
+    hit = vs.similarity_search("beta", k=1)[0]
+    assert hit.page_content == "beta"
+    assert hit.metadata == {"source": "beta"}
+
+
+def test_document_comparator_accepts_same_filename(tmp_path, sample_pdf):
+    comparator = DocumentComparator(base_dir=str(tmp_path / "compare"))
+    pdf_bytes = Path(sample_pdf).read_bytes()
+    uploads = []
+    for _ in range(2):
+        upload = io.BytesIO(pdf_bytes)
+        upload.name = "report.pdf"
+        uploads.append(upload)
+
+    reference_path, actual_path = asyncio.run(comparator.save_uploaded_files(*uploads))
+    assert reference_path != actual_path
+
+    combined = asyncio.run(comparator.combine_documents([reference_path, actual_path]))
+    assert combined.count("Document: report.pdf\n") == 2
+
+
+def test_faiss_nprobe_reads_environment_at_use(monkeypatch):
+    monkeypatch.setenv("FAISS_NPROBE", "32")
+    assert _faiss_nprobe() == 32
+
+    monkeypatch.setenv("FAISS_NPROBE", "many")
+    with pytest.raises(ValueError, match="FAISS_NPROBE"):
+        _faiss_nprobe()
+
+
+def test_concurrent_add_documents_keep_id_mapping(tmp_path, monkeypatch):
+    # Inside FAISS.__add, stall the first writer between index.add and its id-mapping update
+    # so that, without a lock, a later writer overtakes it
+    original_add = InMemoryDocstore.add
+    calls = itertools.count()
+    def slow_add(self, texts):
+        time.sleep(0.05 if next(calls) == 1 else 0)
+        return original_add(self, texts)
+    monkeypatch.setattr(InMemoryDocstore, "add", slow_add)
+
+    index_dir = tmp_path / "faiss"
+    FaissManager(index_dir, model_loader=_FakeModelLoader()).load_or_create(texts=["seed"], metadata=[{"source": "seed"}])
+    managers = [FaissManager(index_dir, model_loader=_FakeModelLoader()) for _ in range(4)]
+    for manager in managers:
+        manager.load_or_create()
+
+    def add(n):
+        texts = [f"doc-{n}-{i}" for i in range(25)]
+        managers[n].add_documents([Document(page_content=t, metadata={"source": t}) for t in texts])
+
+    with ThreadPoolExecutor(max_workers=len(managers)) as ex:
+        list(ex.map(add, range(len(managers))))
+
+    vs = managers[0].vectorstore
+    assert vs.index.ntotal == len(vs.index_to_docstore_id) == 1 + 4 * 25
+    for n in range(len(managers)):
+        text = f"doc-{n}-7"
+        assert vs.similarity_search(text, k=1)[0].page_content == text
@@ -0,0 +1,91 @@
+import time
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from utils.embedding_cache import CachedEmbeddings
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.query_calls: List[str] = []
+        self.document_calls: List[List[str]] = []
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls.append(text)
+        return [1.0, float(len(text))]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls.append(list(texts))
+        return [[0.0, float(len(t))] for t in texts]
+
+
+@pytest.fixture
+def inner():
+    return _CountingEmbeddings()
+
+
+def _cached(inner, tmp_path, **kwargs):
+    return CachedEmbeddings(inner, "test-model", cache_dir=str(tmp_path / "emb_cache"), **kwargs)
+
+
+def test_query_hit_after_miss(inner, tmp_path):
+    cache = _cached(inner, tmp_path)
+
+    first = cache.embed_query("hello  world")
+    second = cache.embed_query("hello world")
+
+    assert first == second
+    assert inner.query_calls == ["hello  world"]
+
+
+def test_documents_batch_only_misses(inner, tmp_path):
+    cache = _cached(inner, tmp_path)
+    cache.embed_documents(["a", "bb"])
+
+    vectors = cache.embed_documents(["a", "ccc", "bb", "dddd"])
+
+    assert inner.document_calls == [["a", "bb"], ["ccc", "dddd"]]
+    assert vectors == [[0.0, 1.0], [0.0, 3.0], [0.0, 2.0], [0.0, 4.0]]
+
+
+def test_query_and_document_keys_are_separate(inner, tmp_path):
+    cache = _cached(inner, tmp_path)
+
+    doc_vector = cache.embed_documents(["same text"])[0]
+    query_vector = cache.embed_query("same text")
+
+    assert query_vector != doc_vector
+    assert inner.query_calls == ["same text"]
+
+
+def test_disk_cache_survives_new_instance(inner, tmp_path):
+    _cached(inner, tmp_path).embed_query("persisted")
+
+    fresh_inner = _CountingEmbeddings()
+    _cached(fresh_inner, tmp_path).embed_query("persisted")
+
+    assert fresh_inner.query_calls == []
+
+
+def test_entries_expire_after_ttl(inner, tmp_path, monkeypatch):
+    cache = _cached(inner, tmp_path, ttl=10)
+    cache.embed_query("stale")
+
+    now_wall, now_mono = time.time(), time.monotonic()
+    monkeypatch.setattr(time, "time", lambda: now_wall + 11)
+    monkeypatch.setattr(time, "monotonic", lambda: now_mono + 11)
+    cache.embed_query("stale")
+
+    assert inner.query_calls == ["stale", "stale"]
+
+
+def test_memory_lru_evicts_least_recent(inner, tmp_path):
+    cache = _cached(inner, tmp_path, maxsize=2)
+    cache.embed_query("one")
+    cache.embed_query("two")
+    cache.embed_query("one")
+    cache.embed_query("three")
+
+    assert list(cache._memory) == [cache._key("query", "one"), cache._key("query", "three")]
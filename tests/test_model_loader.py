@@ -0,0 +1,11 @@
+import pytest
+
+from utils.model_loader import ModelLoader
+
+
+def test_wait_until_ready_requires_preload(monkeypatch):
+    monkeypatch.setattr(ModelLoader, "_preload_thread", None)
+    loader = ModelLoader.__new__(ModelLoader)
+
+    with pytest.raises(RuntimeError):
+        loader.wait_until_ready()
@@ -10,17 +10,14 @@
 from pathlib import Path
 import os
 import yaml
+import orjson
 from typing import Optional
 
 def _project_root() -> Path:
     # .../utils/config_loader.py -> parents[1] == project root
     return Path(__file__).resolve().parents[1]
 
-def load_config(config_path: Optional[str] = None) -> dict:
-    """
-    Resolve config path reliably irrespective of CWD.
-    Priority: explicit arg > CONFIG_PATH env > <project_root>/config/config.yaml
-    """
+def _resolve_config_path(config_path: Optional[str] = None) -> Path:
     env_path = os.getenv("CONFIG_PATH")
     if config_path is None:
         config_path = env_path or str(_project_root() / "config" / "config.yaml")
@@ -31,6 +28,45 @@ def load_config(config_path: Optional[str] = None) -> dict:
 
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
+    return path
+
+def load_config(config_path: Optional[str] = None) -> dict:
+    """
+    Resolve config path reliably irrespective of CWD.
+    Priority: explicit arg > CONFIG_PATH env > <project_root>/config/config.yaml
+    """
+    path = _resolve_config_path(config_path)
 
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
\ No newline at end of file
+        return yaml.safe_load(f) or {}
+
+def load_config_cached(config_path: Optional[str] = None, env: Optional[str] = None) -> dict:
+    """
+    Same as load_config, but reuses a JSON snapshot of the parsed YAML keyed by the file's mtime.
+    The snapshot is only written outside production, where the config dir may be read-only.
+    env defaults to the ENV variable; callers that already resolved it can pass it in.
+    """
+    path = _resolve_config_path(config_path)
+    cache_path = path.with_name(f".{path.name}.{path.stat().st_mtime_ns}.json")
+
+    if cache_path.exists():
+        try:
+            return orjson.loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            pass
+
+    config = load_config(str(path))
+    if env is None:
+        env = os.getenv("ENV", "local").lower()
+    if env != "production":
+        tmp_path = cache_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(orjson.dumps(config))
+            os.replace(tmp_path, cache_path)
+            for stale in path.parent.glob(f".{path.name}.*.json"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+        except (OSError, TypeError, ValueError):
+            # Not JSON-serializable (e.g. YAML dates) or not writable: the parsed YAML is still valid
+            tmp_path.unlink(missing_ok=True)
+    return config
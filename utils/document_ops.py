@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from fastapi import UploadFile
 
 
@@ -5,9 +7,16 @@ class FastAPIFileAdapter:
     def __init__(self, file: UploadFile):
         self._uf = file
         self.name = file.filename
-    def getbuffer(self) -> bytes:
-        self._uf.file.seek(0)
-        return self._uf.file.read()
+    @property
+    def file(self):
+        return self._uf.file
+    async def stream(self, chunk: int = 1 << 20) -> AsyncIterator[bytes]:
+        await self._uf.seek(0)
+        while True:
+            data = await self._uf.read(chunk)
+            if not data:
+                break
+            yield data
 def read_pdf_via_handler(handler, path: str) -> str:
     if hasattr(handler, "read_pdf"):
         return handler.read_pdf(path) # type: ignore
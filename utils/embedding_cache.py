@@ -0,0 +1,83 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import diskcache
+import xxhash
+from langchain_core.embeddings import Embeddings
+
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join("faiss_index", "emb_cache"))
+EMBEDDING_CACHE_TTL = 60 * 60
+EMBEDDING_CACHE_SIZE_LIMIT = 100 * 1024 * 1024
+EMBEDDING_CACHE_MAXSIZE = 4096
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings client with an in-memory LRU backed by an on-disk cache.
+    Keys are an xxh3 hash of the model name, the call kind (query or document) and whitespace-normalized
+    text, so query and document vectors never collide even if the client embeds them differently.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache_dir: Optional[str] = None,
+                 maxsize: int = EMBEDDING_CACHE_MAXSIZE, ttl: int = EMBEDDING_CACHE_TTL):
+        self._inner = embeddings
+        self._model_name = model_name
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = diskcache.Cache(cache_dir or EMBEDDING_CACHE_DIR, size_limit=EMBEDDING_CACHE_SIZE_LIMIT)
+
+    def _key(self, kind: str, text: str) -> str:
+        normalized = " ".join(text.split())
+        return xxhash.xxh3_128_hexdigest(f"{self._model_name}\0{kind}\0{normalized}".encode("utf-8"))
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if hit[0] > now:
+                    self._memory.move_to_end(key)
+                    return hit[1]
+                del self._memory[key]
+        vector = self._disk.get(key)
+        if vector is not None:
+            self._remember(key, vector, now)
+        return vector
+
+    def _remember(self, key: str, vector: List[float], now: float) -> None:
+        with self._lock:
+            self._memory[key] = (now + self._ttl, vector)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._maxsize:
+                self._memory.popitem(last=False)
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector, time.monotonic())
+        self._disk.set(key, vector, expire=self._ttl)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self._inner.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("document", t) for t in texts]
+        vectors: List[Optional[List[float]]] = [self._lookup(k) for k in keys]
+
+        # Only the misses go over the wire, in a single batched call
+        misses = [i for i, v in enumerate(vectors) if v is None]
+        if misses:
+            fresh = self._inner.embed_documents([texts[i] for i in misses])
+            for i, vector in zip(misses, fresh):
+                vectors[i] = vector
+                self._store(keys[i], vector)
+        return vectors  # type: ignore[return-value]
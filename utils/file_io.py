@@ -1,25 +1,17 @@
-import uuid
-from datetime import datetime
+import secrets
+import itertools
+from datetime import datetime, timezone, timedelta
 try:
     from zoneinfo import ZoneInfo
-except ImportError:
-    # Fallback for Python < 3.9
-    from datetime import timezone, timedelta
-    class ZoneInfo:
-        def __init__(self, name):
-            if name == "Asia/Kolkata":
-                self.offset = timedelta(hours=5, minutes=30)
-            else:
-                self.offset = timedelta(0)
-        
-        def __call__(self):
-            return timezone(self.offset)
+    _IST = ZoneInfo("Asia/Kolkata")
+except Exception:
+    # Python < 3.9 or no tz database available: IST has no DST, so a fixed offset is exact
+    _IST = timezone(timedelta(hours=5, minutes=30))
+
+# Per-process random base plus a counter keeps ids unique without a urandom read per call
+_BASE = secrets.token_hex(4)
+_COUNTER = itertools.count()
 
 
 def generate_session_id(prefix: str = "session") -> str:
-    try:
-        ist = ZoneInfo("Asia/Kolkata")
-        return f"{prefix}-{datetime.now(ist).strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:8]}"
-    except:
-        # Fallback to UTC if timezone handling fails
-        return f"{prefix}-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:8]}"
\ No newline at end of file
+    return f"{prefix}-{datetime.now(_IST).strftime('%Y%m%d_%H%M%S')}-{_BASE}{next(_COUNTER):04x}"
@@ -1,19 +1,26 @@
 import os
-import json
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_groq import ChatGroq
+import logging
+import threading
+import functools
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+import orjson
 from dotenv import load_dotenv
-from exceptions.custom_exception import DocumentPortalException
-from logger import GLOBAL_LOGGER as log
-from utils.config_loader import load_config
+from logger import GLOBAL_LOGGER as log, is_enabled_for
+from utils.config_loader import load_config_cached
+
+
+_DOTENV_LOADED = False
 
 
 
 class ApiKeyManager:
-    REQUIRED_KEYS = [
+    __slots__ = ("api_key",)
+
+    REQUIRED_KEYS: frozenset = frozenset((
         "GOOGLE_API_KEY",
         "GROQ_API_KEY",
-    ]
+    ))
     
     # Optional keys that might be used in some deployments
     OPTIONAL_KEYS = [
@@ -28,7 +35,7 @@ class ApiKeyManager:
         raw = os.getenv('API_KEY')
         if raw:
             try:
-                parsed = json.loads(raw)
+                parsed = orjson.loads(raw)
                 if not isinstance(parsed, dict):
                     raise ValueError("API_KEY must be a valid JSON object")
                 self.api_key = parsed
@@ -37,23 +44,28 @@ class ApiKeyManager:
                 log.warning("Failed to parse API_KEYS as JSON", error=str(e))    
         
         # Method 2: Load individual environment variables (for production/AWS Secrets Manager)
-        all_keys = self.REQUIRED_KEYS + self.OPTIONAL_KEYS
-        for key in all_keys:
-            if not self.api_key.get(key):
-                env_val = os.getenv(key)
-                if env_val:
-                    self.api_key[key] = env_val
-                    log.info(f"API_KEY {key} loaded from environment variables")
+        # Only keys the JSON payload didn't supply touch the environment
+        all_keys = (*self.REQUIRED_KEYS, *self.OPTIONAL_KEYS)
+        for key in [k for k in all_keys if not self.api_key.get(k)]:
+            env_val = os.environ.get(key)
+            if env_val:
+                self.api_key[key] = env_val
+                log.info(f"API_KEY {key} loaded from environment variables")
 
         # Check for missing required keys
-        missing = [key for key in self.REQUIRED_KEYS if not self.api_key.get(key)]
+        missing = sorted(key for key in self.REQUIRED_KEYS if not self.api_key.get(key))
         if missing:
             log.warning(f"Missing required API_KEYS", missing=missing)
+            from exceptions.custom_exception import DocumentPortalException
             raise DocumentPortalException("Missing required API_KEYS", missing)
 
+        # Read-only from here on, so the shared instance can't be mutated by callers
+        self.api_key = MappingProxyType(self.api_key)
+
         # Log loaded keys (with masked values for security)
-        loaded_keys = {k: v[:6]+"..." if len(v) > 6 else "***" for k, v in self.api_key.items()}
-        log.info("API_KEYS loaded successfully", keys=loaded_keys)
+        if is_enabled_for(logging.INFO):
+            loaded_keys = {k: v[:6]+"..." if len(v) > 6 else "***" for k, v in self.api_key.items()}
+            log.info("API_KEYS loaded successfully", keys=loaded_keys)
                 
         
 
@@ -65,6 +77,10 @@ class ApiKeyManager:
             raise KeyError(f"API_KEY {key} not found")
         return val
     
+    def __getitem__(self, key: str):
+        """Direct lookup for hot paths; required keys are already validated in __init__."""
+        return self.api_key[key]
+    
     def get_optional(self, key: str, default: str = None):
         """Get an optional API key. Returns default if not found."""
         return self.api_key.get(key, default)
@@ -73,26 +89,86 @@ class ApiKeyManager:
         """Check if an API key is available."""
         return key in self.api_key and bool(self.api_key[key])
 
+def _freeze(value):
+    """Recursively wrap config dicts in read-only views so one parsed config can be shared safely."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+# Provider SDKs are imported on first use; they pull in grpc/http stacks that are slow to import
+def _build_google(model_name, temperature, max_tokens, keys: ApiKeyManager):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+        google_api_key=keys["GOOGLE_API_KEY"]
+    )
+
+def _build_groq(model_name, temperature, max_tokens, keys: ApiKeyManager):
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=keys["GROQ_API_KEY"]
+    )
+
+@functools.lru_cache(maxsize=1)
+def get_api_key_manager() -> ApiKeyManager:
+    """Process-wide ApiKeyManager: the environment is parsed once, on first use."""
+    return ApiKeyManager()
+
 class ModelLoader:
+    # Parsed config and model clients are shared by every ModelLoader in the process,
+    # so repeat loads reuse the same HTTP/gRPC channels instead of reconnecting
+    _CONFIG: Optional[Mapping[str, Any]] = None
+    _LLM_CACHE: Dict[tuple, Any] = {}
+    _EMB_CACHE: Dict[str, Any] = {}
+    # Held while building so concurrent first calls construct a client only once
+    _CACHE_LOCK = threading.Lock()
+    _PRELOAD_LOCK = threading.Lock()
+    _PRELOAD_DONE = threading.Event()
+    _preload_thread: Optional[threading.Thread] = None
+    # provider name in config -> client factory; add new providers here
+    _PROVIDER_FACTORIES = {
+        "google": _build_google,
+        "groq": _build_groq,
+    }
 
-    def __init__(self):
+    def __init__(self, load_env: bool = True):
+        """
+        load_env=False skips reading .env, for callers (e.g. containers) that manage the environment themselves.
+        """
 
-        if os.getenv("ENV","local").lower() != "production":
-            load_dotenv()
-            log.info("Running in local mode, .env loaded")
+        global _DOTENV_LOADED
+        env = os.getenv("ENV","local").lower()
+        if env != "production":
+            # .env only needs reading once per process, however many loaders are built
+            if load_env and not _DOTENV_LOADED:
+                load_dotenv()
+                _DOTENV_LOADED = True
+                log.info("Running in local mode, .env loaded")
 
         else:
             log.info("Running in production mode")
 
-        self.api_key_manager = ApiKeyManager()
-        self.config = load_config()
-        log.info("YAML config loaded", config_keys=list(self.config.keys()))
+        self.api_key_manager = get_api_key_manager()
+        # Resolved after .env is loaded so a provider set there is honoured
+        self._llm_provider = os.getenv("LLM_PROVIDER","google")
+        if ModelLoader._CONFIG is None:
+            ModelLoader._CONFIG = _freeze(load_config_cached(env=env))
+            if is_enabled_for(logging.INFO):
+                log.info("YAML config loaded", config_keys=list(ModelLoader._CONFIG.keys()))
+        self.config = ModelLoader._CONFIG
 
     def load_llm(self):
 
         llm_block = self.config.get("llm",{})
 
-        provider_key = os.getenv("LLM_PROVIDER","google")
+        provider_key = self._llm_provider
 
         if provider_key not in llm_block:
             log.error("LLM provider not found in config", provider=provider_key)
@@ -102,42 +178,79 @@ class ModelLoader:
         provider = llm_config.get("provider")
         model_name = llm_config.get("model_name")
         temperature = llm_config.get("temperature",0.2)
-        max_tokens = llm_config.get("max_tokens",2048)
-
-        log.info("Loading LLM", provider=provider, model_name=model_name, temperature=temperature, max_tokens=max_tokens)
-
-        if provider == "google":
-            return ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                google_api_key=self.api_key_manager.get("GOOGLE_API_KEY")
-            )
-        elif provider == "groq":
-            return ChatGroq(
-                model=model_name,
-                temperature=temperature,
-                api_key=self.api_key_manager.get("GROQ_API_KEY")
-            )
+        # config.yaml spells it max_output_tokens; accept the older max_tokens key too
+        max_tokens = llm_config.get("max_output_tokens", llm_config.get("max_tokens",2048))
 
-        else:
-            log.error("Invalid LLM provider", provider=provider)
-            raise ValueError(f"Invalid LLM provider '{provider}'")
+        cache_key = (provider_key, provider, model_name, temperature, max_tokens)
+        llm = self._LLM_CACHE.get(cache_key)
+        if llm is not None:
+            return llm
+
+        with self._CACHE_LOCK:
+            llm = self._LLM_CACHE.get(cache_key)
+            if llm is not None:
+                return llm
+
+            log.info("Loading LLM", provider=provider, model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+
+            factory = self._PROVIDER_FACTORIES.get(provider)
+            if factory is None:
+                log.error("Invalid LLM provider", provider=provider)
+                raise ValueError(f"Invalid LLM provider '{provider}'")
+            llm = factory(model_name, temperature, max_tokens, self.api_key_manager)
+
+            self._LLM_CACHE[cache_key] = llm
+            return llm
 
 
     def load_embedding_model(self):
 
         try:
             model_name = self.config["embedding_model"]["model_name"]
-            log.info("Loading embedding model", model=model_name)
-            return GoogleGenerativeAIEmbeddings(
-                model=model_name,
-                google_api_key=self.api_key_manager.get("GOOGLE_API_KEY")
-            )
+            cached = self._EMB_CACHE.get(model_name)
+            if cached is not None:
+                return cached
+            with self._CACHE_LOCK:
+                cached = self._EMB_CACHE.get(model_name)
+                if cached is not None:
+                    return cached
+                from langchain_google_genai import GoogleGenerativeAIEmbeddings
+                from utils.embedding_cache import CachedEmbeddings
+                log.info("Loading embedding model", model=model_name)
+                embeddings = GoogleGenerativeAIEmbeddings(
+                    model=model_name,
+                    google_api_key=self.api_key_manager["GOOGLE_API_KEY"]
+                )
+                self._EMB_CACHE[model_name] = CachedEmbeddings(embeddings, model_name)
+                return self._EMB_CACHE[model_name]
         except Exception as e:
             log.error("Failed to load embedding model", error=str(e))
             raise ValueError(f"Failed to load embedding model: {str(e)}")
 
+    def preload_async(self) -> threading.Thread:
+        """Warm the LLM and embedding clients on a daemon thread; returns the (shared) thread."""
+        with self._PRELOAD_LOCK:
+            if ModelLoader._preload_thread is None:
+                ModelLoader._preload_thread = threading.Thread(target=self._preload, name="model-preload", daemon=True)
+                ModelLoader._preload_thread.start()
+            return ModelLoader._preload_thread
+
+    def _preload(self):
+        try:
+            self.load_llm()
+            self.load_embedding_model()
+            log.info("Model clients preloaded")
+        except Exception as e:
+            log.error("Failed to preload model clients", error=str(e))
+        finally:
+            ModelLoader._PRELOAD_DONE.set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until a preload started by preload_async() has finished (successfully or not)."""
+        if ModelLoader._preload_thread is None:
+            raise RuntimeError("Call preload_async() before wait_until_ready().")
+        return self._PRELOAD_DONE.wait(timeout)
+
 if __name__ == "__main__":
     loader = ModelLoader()
 